@@ -5,6 +5,7 @@ Part 1/3: Core Components and Models
 """
 
 import os
+import sys
 import time
 import asyncio
 import discord
@@ -12,11 +13,16 @@ from discord import app_commands
 from discord.ext import commands
 import yt_dlp
 import logging
-from typing import Optional, Dict, List, Tuple, Set
+from typing import Optional, Dict, List, Tuple, Set, Deque, Iterable
 import shutil
-from urllib.parse import urlparse
 import re
+import functools
 from dataclasses import dataclass
+from collections import OrderedDict, deque
+from itertools import islice
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # =============================================================================
 # Logging Setup
@@ -24,6 +30,29 @@ from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Characters stripped from search queries before they reach yt-dlp
+_UNSAFE_QUERY_RE = re.compile(r'[;&|]')
+# Scheme prefix plus the netloc portion of an http(s) URL
+_URL_NETLOC_RE = re.compile(r'https?://([^/?#]*)')
+# A whole query that is one http(s) URL; anything with spaces is a search
+_URL_RE = re.compile(r'https?://\S+')
+EMBED_FIELD_LIMIT = 1024
+
+
+@functools.lru_cache(maxsize=4096)  # Pure, and the same few thousand values recur in every embed
+def format_duration(seconds: float) -> str:
+    """Format duration in seconds to string"""
+    if not seconds:
+        return "00:00"
+
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    seconds = int(seconds % 60)
+
+    if hours > 0:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
 # =============================================================================
 # Core Models
 # =============================================================================
@@ -36,8 +65,12 @@ class Song:
         self.requester = requester
         self.title = source.get('title', 'Unknown title')
         self.thumbnail = source.get('thumbnail', '')
+        # Validated once here so embed refreshes don't re-check the URL
+        self.thumbnail_valid = isinstance(self.thumbnail, str) and self.thumbnail.startswith(('http://', 'https://'))
         self.duration = source.get('duration', 0)
+        self.duration_str = format_duration(self.duration)  # Invariant, so format once
         self.filename = source.get('filename', '')
+        self.stream_url = source.get('stream_url', '')
         self.preloaded = False  # Add this line
         self.added_at = time.time()  # Add this line
 
@@ -48,15 +81,19 @@ class Song:
 class MusicQueue:
     """Manages the music queue and playback state"""
     def __init__(self):
-        self.queue: List[Song] = []
+        self.queue: Deque[Song] = deque()  # O(1) pops from the front
         self._volume = 0.05  # Default volume 5%
         self.current: Optional[Song] = None
         self.now_playing_message: Optional[discord.Message] = None
         self.text_channel: Optional[discord.TextChannel] = None
         self.preloaded_song: Optional[Song] = None
         self.start_time: Optional[float] = None
+        self.paused_at: Optional[float] = None
+        self.paused_total = 0.0  # Seconds the current song has spent paused
         self.loop_mode = 'none'  # none, song, queue
         self.last_progress_update = 0
+        self.owned_files: Set[str] = set()  # Downloads belonging to this guild
+        self.prepared_source: Optional[Tuple[Song, discord.AudioSource]] = None
 
     @property
     def volume(self) -> float:
@@ -72,12 +109,50 @@ class MusicQueue:
         self.current = None
         self.preloaded_song = None
         self.start_time = None
+        self.paused_at = None
+        self.paused_total = 0.0
+        self.discard_prepared_source()
+
+    def take_prepared_source(self, song: Song) -> Optional[discord.AudioSource]:
+        """Return the source prepared for song, discarding it if it was for another song"""
+        prepared, self.prepared_source = self.prepared_source, None
+        if not prepared:
+            return None
+        prepared_song, source = prepared
+        if prepared_song is song:
+            return source
+        source.cleanup()
+        return None
+
+    def discard_prepared_source(self):
+        """Kill the FFmpeg process spawned ahead of time, if any"""
+        if self.prepared_source:
+            self.prepared_source[1].cleanup()
+            self.prepared_source = None
+
+    def start_song(self):
+        """Reset playback timing for a song that just started"""
+        self.start_time = time.time()
+        self.paused_at = None
+        self.paused_total = 0.0
+
+    def mark_paused(self):
+        """Record that playback was paused"""
+        if self.paused_at is None:
+            self.paused_at = time.time()
+
+    def mark_resumed(self):
+        """Record that playback resumed, excluding the pause from progress"""
+        if self.paused_at is not None:
+            self.paused_total += time.time() - self.paused_at
+            self.paused_at = None
 
     def get_song_progress(self) -> float:
-        """Get current song progress in seconds"""
+        """Get current song progress in seconds, not counting time spent paused"""
         if not self.start_time or not self.current:
             return 0
-        return time.time() - self.start_time
+        end = self.paused_at if self.paused_at is not None else time.time()
+        return end - self.start_time - self.paused_total
 
     def toggle_loop_mode(self) -> str:
         """Toggle between loop modes"""
@@ -88,46 +163,80 @@ class MusicQueue:
     def shuffle(self):
         """Shuffle the queue"""
         import random
-        random.shuffle(self.queue)
+        # Deque indexing is O(n) away from the ends, so shuffle a list copy instead
+        songs = list(self.queue)
+        random.shuffle(songs)
+        self.queue.clear()
+        self.queue.extend(songs)
         self.preloaded_song = None
+        self.discard_prepared_source()
 
 class SongCache:
-    """Manages caching of downloaded songs"""
+    """Manages caching of downloaded songs (LRU ordered, oldest first)"""
     def __init__(self, max_size: int = 10, max_age: int = 3600):
-        self.cache: Dict[str, Tuple[str, float]] = {}
+        self.cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
         self.max_size = max_size
         self.max_age = max_age
 
     def get(self, video_id: str) -> Optional[str]:
         """Get cached filename for video ID"""
-        if video_id in self.cache:
-            filename, _ = self.cache[video_id]
-            self.cache[video_id] = (filename, time.time())
-            return filename
-        return None
-
-    def add(self, video_id: str, filename: str):
-        """Add a file to cache"""
-        if len(self.cache) >= self.max_size:
-            oldest = min(self.cache.items(), key=lambda x: x[1][1])
-            del self.cache[oldest[0]]
+        entry = self.cache.get(video_id)
+        if entry is None:
+            return None
+        filename, _ = entry
         self.cache[video_id] = (filename, time.time())
+        self.cache.move_to_end(video_id)
+        return filename
 
-    def cleanup(self):
-        """Remove expired cache entries"""
+    def add(self, video_id: str, filename: str) -> List[str]:
+        """Add a file to cache, returning evicted files for the caller to remove"""
+        if video_id in self.cache:
+            self.cache.move_to_end(video_id)
+        self.cache[video_id] = (filename, time.time())
+        evicted_files = []
+        while len(self.cache) > self.max_size:
+            _, (evicted, _) = self.cache.popitem(last=False)
+            if evicted != filename:
+                evicted_files.append(evicted)
+        return evicted_files
+
+    def cleanup(self) -> List[str]:
+        """Drop expired cache entries, returning their files for the caller to remove"""
         current_time = time.time()
         expired = []
-        for video_id, (filename, timestamp) in self.cache.items():
-            if current_time - timestamp > self.max_age:
-                expired.append(video_id)
-                try:
-                    if os.path.exists(filename):
-                        os.remove(filename)
-                except Exception as e:
-                    logger.error(f"Error removing expired cache file {filename}: {e}")
-
-        for video_id in expired:
+        while self.cache:
+            video_id, (filename, timestamp) = next(iter(self.cache.items()))
+            if current_time - timestamp <= self.max_age:
+                break  # Entries are in access order; the rest are newer
             del self.cache[video_id]
+            expired.append(filename)
+        return expired
+
+class SearchCache:
+    """Keeps recent search results so repeated queries skip yt-dlp"""
+    def __init__(self, max_size: int = 256, ttl: int = 300):
+        self.cache: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self.max_size = max_size
+        self.ttl = ttl
+
+    def get(self, query: str) -> Optional[dict]:
+        """Get unexpired results for a query"""
+        entry = self.cache.get(query)
+        if entry is None:
+            return None
+        info, timestamp = entry
+        if time.time() - timestamp > self.ttl:
+            del self.cache[query]
+            return None
+        self.cache.move_to_end(query)
+        return info
+
+    def add(self, query: str, info: dict):
+        """Store results for a query, evicting the least recently used entry"""
+        self.cache[query] = (info, time.time())
+        self.cache.move_to_end(query)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
 
 class MusicBotError(Exception):
     """Base exception for music bot"""
@@ -164,28 +273,39 @@ class SecurityManager:
 
     def validate_url(self, url: str) -> bool:
         """Validate URL against whitelist"""
-        try:
-            parsed = urlparse(url)
-            return any(domain in parsed.netloc for domain in self.url_whitelist)
-        except Exception:
+        match = _URL_NETLOC_RE.match(url)
+        if not match:
             return False
+        netloc = match.group(1)
+        return any(domain in netloc for domain in self.url_whitelist)
 
     def sanitize_query(self, query: str) -> str:
         """Sanitize search query"""
-        sanitized = re.sub(r'[;&|]', '', query)
+        sanitized = _UNSAFE_QUERY_RE.sub('', query)
         return sanitized[:200]  # Limit query length
 
 
 class RateLimiter:
     """Rate limiting implementation"""
 
-    def __init__(self, calls: int, period: float):
+    def __init__(self, calls: int, period: float, max_tracked: int = 1024):
         self.calls = calls
         self.period = period
+        self.max_tracked = max_tracked
         self.timestamps: Dict[int, List[float]] = {}
 
+    def _evict_idle(self, now: float):
+        """Forget users with no calls inside the current window"""
+        idle = [user_id for user_id, stamps in self.timestamps.items()
+                if not stamps or now - stamps[-1] > self.period]
+        for user_id in idle:
+            del self.timestamps[user_id]
+
     async def acquire(self, user_id: int) -> bool:
         now = time.time()
+        if len(self.timestamps) >= self.max_tracked:
+            self._evict_idle(now)
+
         if user_id not in self.timestamps:
             self.timestamps[user_id] = []
 
@@ -208,9 +328,9 @@ class SongPreloader:
         self.preload_queue = asyncio.Queue()
         self.current_tasks: Set[asyncio.Task] = set()
 
-    async def preload_songs(self, queue: List[Song]):
+    async def preload_songs(self, queue: Iterable[Song]):
         """Preload multiple songs asynchronously"""
-        for song in queue[:self.max_preload]:
+        for song in islice(queue, self.max_preload):
             if not hasattr(song, 'preloaded') or not song.preloaded:
                 task = asyncio.create_task(self._preload_song(song))
                 self.current_tasks.add(task)
@@ -224,20 +344,119 @@ class SongPreloader:
             logger.error(f"Error preloading song {song.title}: {e}")
 
 
-async def download_with_retry(url: str, ydl_opts: dict, max_retries: int = 3) -> dict:
+# Search worker processes build one YoutubeDL up front and reuse it for every search
+_worker_ydl: Optional[yt_dlp.YoutubeDL] = None
+_worker_opts: Optional[dict] = None
+
+
+def init_search_worker(ydl_opts: dict):
+    """Process pool initializer: construct the worker's YoutubeDL once"""
+    global _worker_ydl, _worker_opts
+    # YoutubeDL fills in its params dict in place, so compare against a snapshot
+    _worker_opts = dict(ydl_opts)
+    _worker_ydl = yt_dlp.YoutubeDL(ydl_opts)
+
+
+def extract_info(url: str, ydl_opts: dict) -> dict:
+    """Run a metadata-only yt-dlp extraction; top-level so process pools can pickle it"""
+    if _worker_ydl is not None and ydl_opts == _worker_opts:
+        return _worker_ydl.sanitize_info(_worker_ydl.extract_info(url, download=False))
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        return ydl.sanitize_info(ydl.extract_info(url, download=False))
+
+
+async def download_with_retry(url: str, ydl_opts: dict, max_retries: int = 3,
+                              executor: Optional[Executor] = None) -> dict:
     """Download with retry logic for transient failures"""
+    # Stalls are bounded by the options' socket_timeout; an executor call can't be cancelled,
+    # so an asyncio timeout would only leave the worker busy while a retry queues more work
     for attempt in range(max_retries):
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                return await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: ydl.extract_info(url, download=False)
-                )
+            return await asyncio.get_event_loop().run_in_executor(executor, extract_info, url, ydl_opts)
+        except BrokenProcessPool:
+            raise  # Every retry would fail the same way; the owner has to replace the pool
         except Exception as e:
             if attempt == max_retries - 1:
                 raise DownloadError(f"Failed after {max_retries} attempts: {str(e)}")
             await asyncio.sleep(1.5 ** attempt)  # Exponential backoff
 
+
+def remove_file(path: str) -> bool:
+    """Remove a file if it exists, returning whether it did"""
+    if path and os.path.exists(path):
+        os.remove(path)
+        return True
+    return False
+
+
+def remove_files(paths: Iterable[str]):
+    """Remove each file, logging failures instead of stopping"""
+    for path in paths:
+        try:
+            remove_file(path)
+        except Exception as e:
+            logger.error(f"Error removing song file {path}: {e}")
+
+
+def remove_directory(path: str):
+    """Remove a directory's files and then the directory itself"""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    os.remove(entry.path)
+            except Exception as e:
+                logger.error(f"Error removing file {entry.path}: {e}")
+    os.rmdir(path)
+
+
+def find_empty_directories(base_dir: str) -> List[str]:
+    """List the names of empty subdirectories of base_dir"""
+    empty = []
+    with os.scandir(base_dir) as entries:
+        for entry in entries:
+            # DirEntry type checks reuse the directory listing instead of a stat per entry
+            if not entry.is_dir():
+                continue
+            with os.scandir(entry.path) as contents:
+                if next(contents, None) is None:  # Stop at the first entry
+                    empty.append(entry.name)
+    return empty
+
+
+def best_thumbnail(info: dict) -> Optional[str]:
+    """Pick the thumbnail URL, falling back to the largest entry in 'thumbnails'"""
+    if info.get('thumbnail'):
+        return info['thumbnail']
+    best = max(
+        (t for t in info.get('thumbnails') or [] if isinstance(t, dict) and 'url' in t),
+        key=lambda t: (t.get('width') or 0) * (t.get('height') or 0),
+        default=None
+    )
+    return best['url'] if best else None
+
+
+def downloaded_path(ydl: yt_dlp.YoutubeDL, info: dict) -> str:
+    """Final path of a finished download, after postprocessing"""
+    for download in info.get('requested_downloads') or []:
+        if download.get('filepath'):
+            return download['filepath']
+    # yt-dlp without requested_downloads: the audio postprocessor only swaps the extension
+    return os.path.splitext(ydl.prepare_filename(info))[0] + '.opus'
+
+
+# Bulky info fields the download step never reads
+_UNUSED_INFO_KEYS = ('thumbnails', 'subtitles', 'automatic_captions', 'heatmap', 'chapters')
+
+
+def trim_info(info: dict) -> dict:
+    """Shrink a resolved info dict to what a later download needs"""
+    trimmed = {k: v for k, v in info.items() if k not in _UNUSED_INFO_KEYS}
+    chosen = [f for f in info.get('formats') or [] if f.get('format_id') == info.get('format_id')]
+    if chosen:
+        trimmed['formats'] = chosen
+    return trimmed
+
 # =============================================================================
 # UI Components - Views
 # =============================================================================
@@ -293,11 +512,8 @@ class SongSelectView(discord.ui.View):
                 embed.add_field(name="길이", value=f"{minutes:02d}:{seconds:02d}")
 
             await interaction.response.edit_message(embed=embed, view=None)
-            await asyncio.sleep(3)
-            try:
-                await self.message.delete()
-            except:
-                pass
+            # Deleted in the background so the callback returns immediately
+            await self.message.delete(delay=3)
 
         return callback
 
@@ -312,12 +528,8 @@ class SongSelectView(discord.ui.View):
             color=discord.Color.red()
         )
         await interaction.response.edit_message(embed=embed, view=None)
-        await asyncio.sleep(3)
-        try:
-            await self.message.delete()
-        except:
-            pass
         self.stop()
+        await self.message.delete(delay=3)
 
     async def on_timeout(self):
         try:
@@ -327,8 +539,7 @@ class SongSelectView(discord.ui.View):
                 color=discord.Color.orange()
             )
             await self.message.edit(embed=embed, view=None)
-            await asyncio.sleep(3)
-            await self.message.delete()
+            await self.message.delete(delay=3)
         except:
             pass
 
@@ -337,66 +548,71 @@ class SongSelectView(discord.ui.View):
 # =============================================================================
 
 class PlayerControlsView(discord.ui.View):
-    """View for music player controls"""
+    """View for music player controls (persistent; one instance serves every message)"""
     def __init__(self, cog: 'MusicCog', timeout: int = None):
         super().__init__(timeout=timeout)
         self.cog = cog
 
-    @discord.ui.button(emoji="⏮️", style=discord.ButtonStyle.secondary)
+    @discord.ui.button(emoji="⏮️", style=discord.ButtonStyle.secondary, custom_id="music:previous")
     async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handle previous track button"""
         await interaction.response.defer()
         if interaction.guild.voice_client and interaction.guild.voice_client.is_playing():
             interaction.guild.voice_client.stop()
 
-    @discord.ui.button(emoji="⏯️", style=discord.ButtonStyle.primary)
+    @discord.ui.button(emoji="⏯️", style=discord.ButtonStyle.primary, custom_id="music:play_pause")
     async def play_pause_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handle play/pause button"""
-        await interaction.response.defer()
         vc = interaction.guild.voice_client
         if not vc:
+            await interaction.response.defer()
             return
 
+        # Answering directly is one round trip; defer + followup would be two
+        queue = self.cog.get_queue(interaction.guild.id)
         if vc.is_paused():
             vc.resume()
-            await interaction.followup.send("▶️ 다시 재생합니다.", ephemeral=True)
+            queue.mark_resumed()
+            await interaction.response.send_message("▶️ 다시 재생합니다.", ephemeral=True)
         else:
             vc.pause()
-            await interaction.followup.send("⏸️ 일시정지되었습니다.", ephemeral=True)
+            queue.mark_paused()
+            await interaction.response.send_message("⏸️ 일시정지되었습니다.", ephemeral=True)
 
-    @discord.ui.button(emoji="⏭️", style=discord.ButtonStyle.secondary)
+    @discord.ui.button(emoji="⏭️", style=discord.ButtonStyle.secondary, custom_id="music:skip")
     async def skip_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handle skip button"""
-        await interaction.response.defer()
         if interaction.guild.voice_client and interaction.guild.voice_client.is_playing():
             interaction.guild.voice_client.stop()
-            await interaction.followup.send("⏭️ 노래를 건너뛰었습니다.", ephemeral=True)
+            await interaction.response.send_message("⏭️ 노래를 건너뛰었습니다.", ephemeral=True)
+        else:
+            await interaction.response.defer()
 
-    @discord.ui.button(emoji="🔁", style=discord.ButtonStyle.secondary)
+    @discord.ui.button(emoji="🔁", style=discord.ButtonStyle.secondary, custom_id="music:loop")
     async def loop_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handle loop mode button"""
-        await interaction.response.defer()
         queue = self.cog.get_queue(interaction.guild.id)
         mode = queue.toggle_loop_mode()
 
         modes = {'none': '없음', 'song': '한곡', 'queue': '전체'}
-        await interaction.followup.send(f"🔁 반복 모드를 '{modes[mode]}'으로 설정했습니다.", ephemeral=True)
+        await interaction.response.send_message(f"🔁 반복 모드를 '{modes[mode]}'으로 설정했습니다.", ephemeral=True)
 
+        if not queue.now_playing_message or not queue.current:
+            return  # Clicked on a message from before a restart
         embed = queue.now_playing_message.embeds[0]
         loop_modes = {'none': '', 'song': ' | 🔂 한곡 반복', 'queue': ' | 🔁 전체 반복'}
         embed.set_footer(text=f"요청자: {queue.current.requester.display_name}{loop_modes[mode]}")
-        await queue.now_playing_message.edit(embed=embed)
+        queue.now_playing_message = await queue.now_playing_message.edit(embed=embed)
 
-    @discord.ui.button(emoji="🔀", style=discord.ButtonStyle.secondary)
+    @discord.ui.button(emoji="🔀", style=discord.ButtonStyle.secondary, custom_id="music:shuffle")
     async def shuffle_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handle shuffle button"""
-        await interaction.response.defer()
         queue = self.cog.get_queue(interaction.guild.id)
         if len(queue.queue) >= 2:
             queue.shuffle()
-            await interaction.followup.send("🔀 대기열을 섞었습니다.", ephemeral=True)
+            await interaction.response.send_message("🔀 대기열을 섞었습니다.", ephemeral=True)
         else:
-            await interaction.followup.send("셔플할 노래가 충분하지 않습니다.", ephemeral=True)
+            await interaction.response.send_message("셔플할 노래가 충분하지 않습니다.", ephemeral=True)
 
 # =============================================================================
 # UI Components - Queue Controls
@@ -443,7 +659,7 @@ class QueueControlsView(discord.ui.View):
             progress = queue.get_song_progress()
             duration = queue.current.duration or 0
             time_info = (
-                f"\n⏰ {self.format_duration(int(progress))}/{self.format_duration(duration)}"
+                f"\n⏰ {self.format_duration(int(progress))}/{queue.current.duration_str}"
                 if duration else ""
             )
             embed.add_field(
@@ -453,30 +669,15 @@ class QueueControlsView(discord.ui.View):
             )
 
         if queue.queue:
-            start_idx = self.page * self.max_items
-            end_idx = min(start_idx + self.max_items, len(queue.queue))
-            queue_slice = queue.queue[start_idx:end_idx]
-
-            accumulated_time = queue.current.duration - queue.get_song_progress() if queue.current else 0
-            for i in range(start_idx):
-                accumulated_time += queue.queue[i].duration or 0
-
-            description = []
-            for i, song in enumerate(queue_slice, start=start_idx + 1):
-                time_info = f"⏰ 예상 대기시간: {self.cog.format_duration(int(accumulated_time))}"
-                description.append(
-                    f"{i}. **{song.title}** (요청: {song.requester.display_name})\n   {time_info}"
-                )
-                accumulated_time += song.duration or 0
-
+            description = self.cog.format_queue_page(queue, self.page * self.max_items, self.max_items)
             embed.add_field(
                 name=f"대기 중인 노래 (총 {len(queue.queue)}곡)",
-                value="\n".join(description) if description else "없음",
+                value=description or "없음",
                 inline=False
             )
 
             embed.set_footer(text=f"페이지 {self.page + 1}/{(len(queue.queue) - 1) // self.max_items + 1} | "
-                                f"총 재생시간: {self.format_duration(self.cog.get_queue_duration(queue))}")
+                                f"총 재생시간: {self.format_duration(int(self.cog.get_queue_duration(queue)))}")
 
         await interaction.message.edit(embed=embed, view=self)
 
@@ -490,6 +691,15 @@ class MusicCog(commands.Cog):
         self.queues: Dict[int, MusicQueue] = {}
         self.base_music_dir = 'cogs_data/music_cog'
         self.song_cache = SongCache(max_size=10)
+        self.search_cache = SearchCache()
+        self.background_tasks: Set[asyncio.Task] = set()
+        # Registered once so its buttons keep working on old messages, even after a restart
+        self.player_controls = PlayerControlsView(self)
+        self.bot.add_view(self.player_controls)
+        # Per-song (lock, users), so unrelated downloads don't wait; dropped once nobody needs it
+        self.download_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+        self.download_semaphore = asyncio.Semaphore(3)  # Bot-wide cap on concurrent yt-dlp downloads
+        self.download_opts: Dict[int, dict] = {}
         self.security = SecurityManager()
         self.resource_limits = ResourceLimits()
         self.preloader = SongPreloader()
@@ -506,10 +716,11 @@ class MusicCog(commands.Cog):
         self.ydl_opts = {
             'format': 'bestaudio/best',
             'restrictfilenames': True,
+            # Opus is Discord's voice codec; YouTube's webm audio is remuxed rather than transcoded
             'postprocessors': [{
                 'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
+                'preferredcodec': 'opus',
+                'preferredquality': '128',
             }],
             'noplaylist': True,
             'quiet': True,
@@ -527,29 +738,73 @@ class MusicCog(commands.Cog):
             'extract_flat': 'in_playlist',
             'skip_download': True,
             'default_search': 'ytsearch',
+            'socket_timeout': 15,
         }
 
+        self.search_executor = self.create_search_executor()
+
+    def create_search_executor(self) -> ProcessPoolExecutor:
+        """Start the search worker pool"""
+        # yt-dlp parsing is GIL-bound, so searches get their own processes,
+        # each holding one YoutubeDL built from search_opts; one per core, at most 4
+        return ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            initializer=init_search_worker,
+            initargs=(self.search_opts,)
+        )
+
+    async def search(self, search_term: str) -> dict:
+        """Run a search in the worker pool, replacing the pool if a worker died"""
+        executor = self.search_executor
+        try:
+            return await download_with_retry(search_term, self.search_opts, executor=executor)
+        except BrokenProcessPool:
+            # A killed or OOM'd worker breaks the whole pool for good
+            if self.search_executor is executor:  # Concurrent searches may have replaced it already
+                logger.warning("Search worker pool broke; starting a new one")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self.search_executor = self.create_search_executor()
+        try:
+            return await download_with_retry(search_term, self.search_opts, executor=self.search_executor)
+        except BrokenProcessPool as e:
+            raise DownloadError(f"Search workers unavailable: {e}")
+
+    async def cog_unload(self):
+        self.cache_cleanup_task.cancel()
+        self.directory_cleanup_task.cancel()
+        self.search_executor.shutdown(wait=False, cancel_futures=True)
+        self.player_controls.stop()
+        # Guilds are independent, so their message deletes and file removals can overlap
+        results = await asyncio.gather(
+            *(self.cleanup_files(guild_id) for guild_id in list(self.queues)),
+            return_exceptions=True
+        )
+        for error in results:
+            if isinstance(error, Exception):
+                logger.error(f"Error cleaning up guild on unload: {error}")
+        logger.info("MusicCog unloaded")
+
     def get_guild_directory(self, guild_id: int) -> str:
         """Get guild-specific directory path"""
         guild_dir = os.path.join(self.base_music_dir, str(guild_id))
         os.makedirs(guild_dir, exist_ok=True)
         return guild_dir
 
+    def get_download_opts(self, guild_id: int) -> dict:
+        """Get download options writing into the guild directory"""
+        opts = self.download_opts.get(guild_id)
+        if opts is None:
+            # Path and directory resolved once per guild instead of on every play and download
+            outtmpl = os.path.join(self.get_guild_directory(guild_id), '%(title)s.%(ext)s')
+            opts = self.download_opts[guild_id] = {**self.ydl_opts, 'outtmpl': outtmpl}
+        # YoutubeDL keeps and fills in the dict it is given, so each instance gets its own copy
+        return dict(opts)
+
     async def cleanup_guild_directory(self, guild_id: int):
         """Clean up guild-specific directory"""
         guild_dir = self.get_guild_directory(guild_id)
         try:
-            # Remove all files in the guild directory
-            for filename in os.listdir(guild_dir):
-                file_path = os.path.join(guild_dir, filename)
-                try:
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                except Exception as e:
-                    logger.error(f"Error removing file {file_path}: {e}")
-
-            # Remove the guild directory itself
-            os.rmdir(guild_dir)
+            await self.bot.loop.run_in_executor(None, remove_directory, guild_dir)
         except Exception as e:
             logger.error(f"Error cleaning up guild directory: {e}")
 
@@ -557,16 +812,17 @@ class MusicCog(commands.Cog):
         """Periodically clean up empty guild directories"""
         while not self.bot.is_closed():
             try:
-                for guild_folder in os.listdir(self.base_music_dir):
-                    guild_path = os.path.join(self.base_music_dir, guild_folder)
-                    if os.path.isdir(guild_path):
-                        # Check if directory is empty and guild is not active
-                        if not os.listdir(guild_path) and int(guild_folder) not in self.queues:
-                            try:
-                                os.rmdir(guild_path)
-                                logger.info(f"Removed empty guild directory: {guild_folder}")
-                            except Exception as e:
-                                logger.error(f"Error removing empty guild directory {guild_folder}: {e}")
+                empty = await self.bot.loop.run_in_executor(None, find_empty_directories, self.base_music_dir)
+                for guild_folder in empty:
+                    if int(guild_folder) in self.queues:
+                        continue  # Guild is still active
+                    try:
+                        await self.bot.loop.run_in_executor(
+                            None, os.rmdir, os.path.join(self.base_music_dir, guild_folder)
+                        )
+                        logger.info(f"Removed empty guild directory: {guild_folder}")
+                    except Exception as e:
+                        logger.error(f"Error removing empty guild directory {guild_folder}: {e}")
 
                 await asyncio.sleep(3600)  # Check every hour
             except Exception as e:
@@ -580,6 +836,7 @@ class MusicCog(commands.Cog):
         return self.queues[guild_id]
 
     async def cleanup_files(self, guild_id: int):
+        self.download_opts.pop(guild_id, None)
         queue = self.queues.pop(guild_id, None)
         if not queue:
             return
@@ -599,12 +856,56 @@ class MusicCog(commands.Cog):
             except Exception as e:
                 logger.error(f"Error removing now playing message: {e}")
 
+        # Kill the pre-started FFmpeg first; Windows won't delete a file it still has open
+        queue.discard_prepared_source()
+
+        # Remove only the downloads this queue registered
+        in_use = self.files_in_use()  # This queue is already out of self.queues
+        owned_files = [f for f in queue.owned_files if f not in in_use]
+        queue.owned_files.clear()
+        await self.bot.loop.run_in_executor(None, remove_files, owned_files)
+
         queue.clear()
 
         # Clean up guild directory if needed
         if not self.bot.get_guild(guild_id):  # If guild no longer exists
             await self.cleanup_guild_directory(guild_id)
 
+    @asynccontextmanager
+    async def download_lock(self, key: str):
+        """Hold the lock serializing downloads of a single song"""
+        lock, users = self.download_locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self.download_locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            # Counting users, not lock.locked(): a woken waiter doesn't hold the lock yet
+            lock, users = self.download_locks[key]
+            if users == 1:
+                del self.download_locks[key]
+            else:
+                self.download_locks[key] = (lock, users - 1)
+
+    def _adopt_cached_file(self, queue: MusicQueue, song: Song, video_id: Optional[str]) -> bool:
+        """Point song at its cached download, if one exists"""
+        cached_file = self.song_cache.get(video_id) if video_id else None
+        if not cached_file or not os.path.exists(cached_file):
+            return False
+        song.filename = cached_file
+        queue.owned_files.add(cached_file)
+        self._mark_preloaded(queue, song)
+        return True
+
+    @staticmethod
+    def _mark_preloaded(queue: MusicQueue, song: Song):
+        """Mark song as preloaded if it is still next in line"""
+        # A skip, 삭제 or 이동 during the download may have moved it; a stale marker would block preloading
+        if queue.queue and queue.queue[0] is song:
+            queue.preloaded_song = song
+
     async def preload_next_song(self, guild_id: int):
         """Preload the next song in queue"""
         queue = self.get_queue(guild_id)
@@ -612,45 +913,128 @@ class MusicCog(commands.Cog):
             return
 
         next_song = queue.queue[0]
+        if next_song.filename and os.path.exists(next_song.filename):
+            # Queued as a cache hit, so it already points at a downloaded file
+            queue.preloaded_song = next_song
+            return
+
         try:
             video_id = next_song.source.get('id')
-            if video_id:
-                cached_file = self.song_cache.get(video_id)
-                if cached_file and os.path.exists(cached_file):
-                    next_song.filename = cached_file
-                    queue.preloaded_song = next_song
+            # Lock-free fast path for cache hits
+            if self._adopt_cached_file(queue, next_song, video_id):
+                return
+
+            async with self.download_lock(video_id or next_song.source['webpage_url']):
+                # Another guild may have downloaded it while we waited
+                if self._adopt_cached_file(queue, next_song, video_id):
                     return
 
-            guild_dir = self.get_guild_directory(guild_id)
-            ydl_opts = self.ydl_opts.copy()
-            ydl_opts['outtmpl'] = os.path.join(guild_dir, '%(title)s.%(ext)s')
+                async with self.download_semaphore:
+                    with yt_dlp.YoutubeDL(self.get_download_opts(guild_id)) as ydl:
+                        info = await self.bot.loop.run_in_executor(None, self.download_song, ydl, next_song)
+                        filename = downloaded_path(ydl, info)
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = await self.bot.loop.run_in_executor(
-                    None,
-                    lambda: ydl.extract_info(next_song.source['webpage_url'], download=True)
-                )
-                filename = ydl.prepare_filename(info).replace('.webm', '.mp3').replace('.m4a', '.mp3')
                 next_song.filename = filename
-                queue.preloaded_song = next_song
+                queue.owned_files.add(filename)
+                self._mark_preloaded(queue, next_song)
 
                 if video_id:
-                    self.song_cache.add(video_id, filename)
+                    in_use = self.files_in_use()
+                    evicted = [f for f in self.song_cache.add(video_id, filename) if f not in in_use]
+                    if evicted:
+                        await self.bot.loop.run_in_executor(None, remove_files, evicted)
         except Exception as e:
             logger.error(f"Error preloading next song: {e}")
 
-    def format_duration(self, seconds: float) -> str:
-        """Format duration in seconds to string"""
-        if not seconds:
-            return "00:00"
+    async def prefetch_next(self, guild_id: int):
+        """Download the next song and start its FFmpeg ahead of the transition"""
+        await self.preload_next_song(guild_id)
+        await self.prepare_next_source(guild_id)
+
+    @staticmethod
+    def download_song(ydl: yt_dlp.YoutubeDL, song: Song) -> dict:
+        """Download a song, reusing the info resolved when it was queued"""
+        info = song.source.pop('info', None)
+        if info:
+            try:
+                return ydl.process_ie_result(info, download=True)
+            except Exception as e:
+                # Most likely the stream URL expired while the song sat in the queue
+                logger.warning(f"Resolved info for {song.title} unusable, extracting again: {e}")
+        return ydl.extract_info(song.source['webpage_url'], download=True)
+
+    def create_audio_source(self, song: Song, volume: float, start_at: float = 0) -> discord.FFmpegOpusAudio:
+        """Spawn FFmpeg for a song, from its file if downloaded or else its stream"""
+        # FFmpeg applies the volume and emits Opus, so no Python runs per audio frame
+        ffmpeg_options = {
+            'options': f'-vn -af volume={volume:.2f}',
+            'executable': r'C:\Users\luvwl\ffmpeg\bin\ffmpeg.exe'
+        }
+        before_options = [f'-ss {start_at:.2f}'] if start_at > 0 else []
+
+        if song.filename and os.path.exists(song.filename):
+            audio_input = song.filename
+            if volume >= 1.0 and audio_input.endswith('.opus'):
+                # Nothing to filter; pass the downloaded Opus packets through without re-encoding
+                ffmpeg_options['options'] = '-vn'
+                # FFmpegOpusAudio maps an 'opus' codec to '-c:a copy', as from_probe does
+                ffmpeg_options['codec'] = 'opus'
+            logger.info(f"Opening file: {audio_input}")
+        else:
+            # Not downloaded (yet); stream it so playback starts right away
+            audio_input = song.stream_url
+            before_options.append('-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5')
+            logger.info(f"Opening stream: {song.title}")
+
+        if before_options:
+            ffmpeg_options['before_options'] = ' '.join(before_options)
+
+        return discord.FFmpegOpusAudio(audio_input, **ffmpeg_options)
+
+    async def apply_volume(self, voice_client: discord.VoiceClient, queue: MusicQueue):
+        """Restart the current song's FFmpeg at the new volume from the same position"""
+        song = queue.current
+        old_source = voice_client.source
+        # Spawning FFmpeg blocks, so do it off the event loop like prepare_next_source
+        source = await self.bot.loop.run_in_executor(
+            None, self.create_audio_source, song, queue.volume, queue.get_song_progress()
+        )
+        # The song may have ended, been skipped or stopped while FFmpeg was starting
+        if queue.current is not song or voice_client.source is not old_source or not voice_client.is_connected():
+            source.cleanup()
+            return
+        was_paused = voice_client.is_paused()
+        voice_client.source = source
+        if was_paused:
+            voice_client.pause()  # Swapping the source resumes playback
+        # The audio thread may still be mid-read on the old process, so kill it a moment later
+        self.bot.loop.call_later(1, old_source.cleanup)
+
+    async def prepare_next_source(self, guild_id: int):
+        """Start FFmpeg for the preloaded next song so the transition skips its startup"""
+        queue = self.queues.get(guild_id)
+        if not queue or queue.prepared_source:
+            return
+
+        song = queue.preloaded_song
+        if not song or not song.filename:
+            return
+
+        try:
+            source = await self.bot.loop.run_in_executor(None, self.create_audio_source, song, queue.volume)
+        except Exception as e:
+            logger.error(f"Error preparing next song source: {e}")
+            return
 
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = int(seconds % 60)
+        # The queue may have been stopped or advanced while FFmpeg was starting
+        if self.queues.get(guild_id) is not queue or queue.preloaded_song is not song or queue.prepared_source:
+            source.cleanup()
+            return
+        queue.prepared_source = (song, source)
 
-        if hours > 0:
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        return f"{minutes:02d}:{seconds:02d}"
+    def format_duration(self, seconds: float) -> str:
+        """Format duration in seconds to string"""
+        return format_duration(seconds)
 
     def get_queue_duration(self, queue: MusicQueue) -> int:
         """Calculate total duration of queue"""
@@ -662,6 +1046,27 @@ class MusicCog(commands.Cog):
                 total += song.duration
         return total
 
+    def format_queue_page(self, queue: MusicQueue, start: int, count: int) -> str:
+        """Render queue entries start..start+count with their estimated wait times"""
+        accumulated_time = (queue.current.duration or 0) - queue.get_song_progress() if queue.current else 0
+        for song in islice(queue.queue, start):
+            accumulated_time += song.duration or 0
+
+        lines = []
+        length = 0
+        for i, song in enumerate(islice(queue.queue, start, start + count), start=start + 1):
+            line = (f"{i}. **{song.title}** (요청: {song.requester.display_name})\n"
+                    f"   ⏰ 예상 대기시간: {self.format_duration(int(accumulated_time))}")
+            # Discord rejects field values over 1024 characters; leave room for the "more" line
+            if length + len(line) + 1 > EMBED_FIELD_LIMIT - 32:
+                lines.append(f"... 외 {min(start + count, len(queue.queue)) - i + 1}곡")
+                break
+            lines.append(line)
+            length += len(line) + 1
+            accumulated_time += song.duration or 0
+
+        return "\n".join(lines)
+
     def create_progress_bar(self, progress: float, duration: float, length: int = 20) -> str:
         """Create a text progress bar"""
         filled = int((progress / duration) * length)
@@ -673,6 +1078,8 @@ class MusicCog(commands.Cog):
         """Update the progress bar periodically"""
         try:
             while True:
+                # Other edits replace the stored message, so re-read it every tick
+                message = queue.now_playing_message
                 if not queue.current or not message:
                     return
 
@@ -688,8 +1095,11 @@ class MusicCog(commands.Cog):
                     progress_bar = self.create_progress_bar(progress, duration)
                     try:
                         embed = message.embeds[0]
-                        embed.description = f"**{queue.current.title}**\n{progress_bar}\n볼륨: {int(queue.volume * 100)}%"
-                        await message.edit(embed=embed)
+                        description = f"**{queue.current.title}**\n{progress_bar}\n볼륨: {int(queue.volume * 100)}%"
+                        # Progress excludes paused time, so a paused song's bar is unchanged; skip the API call
+                        if description != embed.description:
+                            embed.description = description
+                            queue.now_playing_message = await message.edit(embed=embed)
                     except discord.NotFound:
                         return
                     except Exception as e:
@@ -699,43 +1109,129 @@ class MusicCog(commands.Cog):
         except asyncio.CancelledError:
             return
 
+    def files_in_use(self, exclude: Optional[Song] = None) -> Set[str]:
+        """Files still needed by a playing or queued song in any guild"""
+        # Cache hits share one download between songs, even across guilds
+        in_use = set()
+        for queue in self.queues.values():
+            for song in (queue.current, *queue.queue):
+                if song and song is not exclude and song.filename:
+                    in_use.add(song.filename)
+        return in_use
+
+    async def remove_song_file(self, queue: MusicQueue, song: Song):
+        """Remove a finished song's file"""
+        if song.filename in self.files_in_use(exclude=song):
+            return  # Queued again, here or in another guild
+        # Windows can keep the handle for a moment after FFmpeg exits; POSIX never does
+        attempts = 2 if sys.platform == 'win32' else 1
+        for attempt in range(attempts):
+            try:
+                # Off the event loop; a slow disk shouldn't stall voice or gateway traffic
+                if await self.bot.loop.run_in_executor(None, remove_file, song.filename):
+                    logger.info(f"Removed finished song file: {song.filename}")
+                queue.owned_files.discard(song.filename)
+                return
+            except PermissionError as e:
+                if attempt < attempts - 1:
+                    await asyncio.sleep(0.5)
+                else:
+                    logger.error(f"Error removing finished song file: {e}")
+            except Exception as e:
+                logger.error(f"Error removing finished song file: {e}")
+                break
+        # Still owned, so cleanup_files tries again when the queue is torn down
+
+    async def show_now_playing(self, queue: MusicQueue, channel: discord.abc.Messageable, embed: discord.Embed):
+        """Edit the now playing message in place, sending a new one only when needed"""
+        message = queue.now_playing_message
+        if message and message.channel.id == channel.id:
+            try:
+                # edit() returns the updated message; the old object keeps the previous embed
+                queue.now_playing_message = await message.edit(embed=embed)
+                return
+            except discord.HTTPException as e:
+                if not isinstance(e, discord.NotFound):
+                    logger.error(f"Error editing now playing message: {e}")
+        elif message:
+            try:
+                await message.delete()
+            except discord.NotFound:
+                pass
+            except Exception as e:
+                logger.error(f"Error deleting now playing message: {e}")
+
+        queue.now_playing_message = await channel.send(embed=embed, view=self.player_controls)
+
+    async def prune_idle_queues(self):
+        """Drop queues of guilds where nothing is playing or queued and the bot isn't connected"""
+        idle = [guild_id for guild_id, queue in self.queues.items() if not queue.current and not queue.queue]
+        for guild_id in idle:
+            guild = self.bot.get_guild(guild_id)
+            if guild and guild.voice_client:
+                continue
+            await self.cleanup_files(guild_id)
+
     async def periodic_cache_cleanup(self):
         """Run periodic cache cleanup"""
         while not self.bot.is_closed():
             try:
-                self.song_cache.cleanup()
+                in_use = self.files_in_use()
+                expired = [f for f in self.song_cache.cleanup() if f not in in_use]
+                if expired:
+                    await self.bot.loop.run_in_executor(None, remove_files, expired)
+                await self.prune_idle_queues()
                 await asyncio.sleep(300)  # Every 5 minutes
             except Exception as e:
                 logger.error(f"Error in cache cleanup: {e}")
                 await asyncio.sleep(60)
 
     async def process_song(self, info: dict, requester: discord.Member, ydl_opts: dict) -> Song:
-        """Process song info and download"""
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                download_info = await self.bot.loop.run_in_executor(
-                    None,
-                    lambda: ydl.extract_info(info['webpage_url'], download=True)
-                )
-
-                if not download_info:
-                    raise DownloadError("Failed to download song info")
-
-                filename = ydl.prepare_filename(download_info).replace('.webm', '.mp3').replace('.m4a', '.mp3')
+        """Resolve song info into a playable song"""
+        video_id = info.get('id')
+        cached_file = self.song_cache.get(video_id) if video_id else None
+        if cached_file and os.path.exists(cached_file):
+            # The search/URL pass already carries the metadata; skip yt-dlp entirely
+            source = {
+                'title': info.get('title', 'Unknown Title'),
+                'thumbnail': best_thumbnail(info),
+                'duration': info.get('duration'),
+                'filename': cached_file,
+                'id': video_id,
+                'webpage_url': info.get('webpage_url') or info.get('url'),
+            }
+            return Song(source, requester)
 
-                if not os.path.exists(filename):
-                    raise DownloadError("Downloaded file not found")
-
-                source = {
-                    'title': download_info.get('title', 'Unknown Title'),
-                    'thumbnail': download_info.get('thumbnail'),
-                    'duration': download_info.get('duration'),
-                    'filename': filename,
-                    'id': download_info.get('id'),
-                    'webpage_url': download_info.get('webpage_url'),
-                }
+        try:
+            if 'formats' in info:
+                # Full extraction from the URL path already has the stream URL
+                stream_info = info
+            else:
+                url = info.get('webpage_url') or info['url']
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    stream_info = await self.bot.loop.run_in_executor(
+                        None,
+                        lambda: ydl.extract_info(url, download=False)
+                    )
 
-                return Song(source, requester)
+            if not stream_info or not stream_info.get('url'):
+                raise DownloadError("Failed to resolve audio stream")
+
+            # Played straight from the stream; preload_next_song downloads it to disk
+            # ahead of time when it reaches the front of the queue
+            source = {
+                'title': stream_info.get('title', 'Unknown Title'),
+                'thumbnail': best_thumbnail(stream_info),
+                'duration': stream_info.get('duration'),
+                'filename': '',
+                'stream_url': stream_info['url'],
+                'id': stream_info.get('id'),
+                'webpage_url': stream_info.get('webpage_url'),
+                # Lets preload_next_song download without resolving the page again
+                'info': trim_info(stream_info),
+            }
+
+            return Song(source, requester)
 
         except Exception as e:
             logger.error(f"Error processing song: {e}")
@@ -773,7 +1269,9 @@ class MusicCog(commands.Cog):
                 return
 
             # URL validation and sanitization
-            if query.startswith(('http://', 'https://')):
+            query = query.strip()
+            is_url = _URL_RE.fullmatch(query) is not None
+            if is_url:
                 if not self.security.validate_url(query):
                     await interaction.response.send_message(
                         "지원하지 않는 URL입니다.",
@@ -786,39 +1284,44 @@ class MusicCog(commands.Cog):
             await interaction.response.defer()
 
             try:
-                if not query.startswith(('https://', 'http://')):
+                if not is_url:
                     # Search functionality with retry
-                    with yt_dlp.YoutubeDL(self.search_opts) as ydl:
+                    search_key = query.casefold()
+                    info = self.search_cache.get(search_key)
+                    if info is None:
                         search_term = f"ytsearch5:{query}"
-                        info = await download_with_retry(search_term, self.search_opts)
+                        info = await self.search(search_term)
+                        if info and info.get('entries'):
+                            self.search_cache.add(search_key, info)
 
-                        if not info or 'entries' not in info:
-                            await interaction.followup.send("검색 결과를 찾을 수 없습니다.", ephemeral=True)
-                            return
+                    if not info or 'entries' not in info:
+                        await interaction.followup.send("검색 결과를 찾을 수 없습니다.", ephemeral=True)
+                        return
 
-                        entries = info.get('entries', [])[:5]
-                        if not entries:
-                            await interaction.followup.send("검색 결과를 찾을 수 없습니다.", ephemeral=True)
-                            return
+                    entries = info.get('entries', [])[:5]
+                    if not entries:
+                        await interaction.followup.send("검색 결과를 찾을 수 없습니다.", ephemeral=True)
+                        return
 
-                        view = SongSelectView(entries)
-                        embed = discord.Embed(
-                            title="🎵 노래 선택",
-                            description="\n".join(f"{i + 1}. {entry['title']}" for i, entry in enumerate(entries))
-                        )
-                        embed.set_footer(text="60초 내에 선택해주세요")
+                    view = SongSelectView(entries)
+                    embed = discord.Embed(
+                        title="🎵 노래 선택",
+                        description="\n".join(f"{i + 1}. {entry['title']}" for i, entry in enumerate(entries))
+                    )
+                    embed.set_footer(text="60초 내에 선택해주세요")
 
-                        msg = await interaction.followup.send(embed=embed, view=view)
-                        view.message = msg
-                        await view.wait()
+                    msg = await interaction.followup.send(embed=embed, view=view)
+                    view.message = msg
+                    await view.wait()
 
-                        if not view.selected_entry:
-                            return
+                    if not view.selected_entry:
+                        return
 
-                        info = view.selected_entry
+                    info = view.selected_entry
                 else:
                     # Direct URL with retry
-                    info = await download_with_retry(query, self.ydl_opts)
+                    # A copy: YoutubeDL fills in its params, and self.ydl_opts is every guild's template
+                    info = await download_with_retry(query, dict(self.ydl_opts))
 
                 # Resource limit checks
                 if info.get('duration', 0) > self.resource_limits.max_song_duration:
@@ -831,25 +1334,30 @@ class MusicCog(commands.Cog):
                     return
 
                 # Download and process
-                guild_dir = self.get_guild_directory(interaction.guild.id)
-                ydl_opts = self.ydl_opts.copy()
-                ydl_opts['outtmpl'] = os.path.join(guild_dir, '%(title)s.%(ext)s')
-
+                ydl_opts = self.get_download_opts(interaction.guild.id)
                 song = await self.process_song(info, interaction.user, ydl_opts)
+                # Look the queue up again: prune_idle_queues may have dropped the still-empty one meanwhile
+                queue = self.get_queue(interaction.guild.id)
                 queue.queue.append(song)
+                if song.filename:
+                    queue.owned_files.add(song.filename)
                 queue.text_channel = interaction.channel
 
-                # Connect and play
-                if not interaction.guild.voice_client:
-                    await interaction.user.voice.channel.connect()
-                    await self.play_next(interaction.guild, interaction.channel)
-                elif not interaction.guild.voice_client.is_playing():
-                    await self.play_next(interaction.guild, interaction.channel)
+                # Connect and play; the ack doesn't have to wait for playback setup
+                voice_client = interaction.guild.voice_client
+                if not voice_client:
+                    voice_client = await interaction.user.voice.channel.connect()
 
-                await interaction.followup.send(
+                pending = [interaction.followup.send(
                     f"🎵 **{song.title}** 를 재생목록에 추가했습니다.",
                     ephemeral=True
-                )
+                )]
+                if voice_client.is_playing() or voice_client.is_paused():
+                    # play_next only prefetches on transitions; start now so this song is ready in time
+                    self.spawn(self.prefetch_next(interaction.guild.id))
+                else:
+                    pending.append(self.play_next(interaction.guild, interaction.channel))
+                await asyncio.gather(*pending)
 
                 # Start preloading next songs
                 await self.preloader.preload_songs(queue.queue)
@@ -866,6 +1374,21 @@ class MusicCog(commands.Cog):
             logger.error(f"Critical error in play command: {str(e)}", exc_info=True)
             await interaction.followup.send(f"명령어 처리 중 오류가 발생했습니다: {str(e)}", ephemeral=True)
 
+    def spawn(self, coro) -> asyncio.Task:
+        """Start a background task and keep a reference until it finishes"""
+        task = self.bot.loop.create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    def song_finished(self, guild: discord.Guild, queue: MusicQueue, song: Song):
+        """Follow up on a finished song; called on the event loop"""
+        # discord.py runs the after callback before cleaning up the source, so on a skip FFmpeg
+        # may still hold the file; remove_song_file retries on Windows for that
+        if queue.loop_mode == 'none':
+            self.spawn(self.remove_song_file(queue, song))
+        self.spawn(self.play_next(guild))
+
     async def play_next(self, guild: discord.Guild, text_channel: Optional[discord.TextChannel] = None):
         if not guild.voice_client:
             return
@@ -883,18 +1406,9 @@ class MusicCog(commands.Cog):
                 pass
 
         try:
-            if queue.now_playing_message:
-                try:
-                    await queue.now_playing_message.delete()
-                except discord.NotFound:
-                    pass
-                except Exception as e:
-                    logger.error(f"Error deleting now playing message: {e}")
-                queue.now_playing_message = None
-
             if queue.current:
                 if queue.loop_mode == 'song':
-                    queue.queue.insert(0, queue.current)
+                    queue.queue.appendleft(queue.current)
                 elif queue.loop_mode == 'queue':
                     queue.queue.append(queue.current)
 
@@ -903,47 +1417,25 @@ class MusicCog(commands.Cog):
                 await guild.voice_client.disconnect()
                 return
 
-            queue.current = queue.queue.pop(0)
-            queue.start_time = time.time()
+            queue.current = queue.queue.popleft()
+            if queue.preloaded_song is queue.current:
+                queue.preloaded_song = None  # Let the next song preload
+            queue.start_song()
             queue.last_progress_update = time.time()
 
+            finished_song = queue.current
+
             def after_playing(error):
                 if error:
                     logger.error(f"Error playing song: {error}")
 
-                async def cleanup():
-                    await asyncio.sleep(1)
-                    try:
-                        if queue.current and os.path.exists(queue.current.filename):
-                            for attempt in range(3):
-                                try:
-                                    os.remove(queue.current.filename)
-                                    logger.info(f"Removed finished song file: {queue.current.filename}")
-                                    break
-                                except Exception:
-                                    if attempt < 2:
-                                        await asyncio.sleep(1)
-                    except Exception as e:
-                        logger.error(f"Error removing finished song file: {e}")
-
-                asyncio.run_coroutine_threadsafe(cleanup(), self.bot.loop)
-                asyncio.run_coroutine_threadsafe(self.play_next(guild), self.bot.loop)
+                # Runs on the audio thread; a single handoff, the loop side starts the tasks
+                self.bot.loop.call_soon_threadsafe(self.song_finished, guild, queue, finished_song)
 
             try:
-                ffmpeg_options = {
-                    'options': '-vn',
-                    'executable': r'C:\Users\luvwl\ffmpeg\bin\ffmpeg.exe'
-                }
-
-                logger.info(f"Playing file: {queue.current.filename}")
-
-                source = discord.PCMVolumeTransformer(
-                    discord.FFmpegPCMAudio(
-                        queue.current.filename,
-                        **ffmpeg_options
-                    ),
-                    volume=queue.volume
-                )
+                source = queue.take_prepared_source(queue.current)
+                if source is None:
+                    source = self.create_audio_source(queue.current, queue.volume)
 
                 guild.voice_client.play(source, after=after_playing)
 
@@ -956,22 +1448,21 @@ class MusicCog(commands.Cog):
                     description=f"**{queue.current.title}**{progress_bar}\n볼륨: {int(queue.volume * 100)}%",
                     color=discord.Color.blue()
                 )
-                if queue.current.thumbnail:
+                if queue.current.thumbnail_valid:
                     embed.set_thumbnail(url=queue.current.thumbnail)
 
                 loop_modes = {'none': '', 'song': ' | 🔂 한곡 반복', 'queue': ' | 🔁 전체 반복'}
                 embed.set_footer(text=f"요청자: {queue.current.requester.display_name}{loop_modes[queue.loop_mode]}")
 
                 channel_to_use = queue.text_channel or guild.text_channels[0]
-                view = PlayerControlsView(self)
-                queue.now_playing_message = await channel_to_use.send(embed=embed, view=view)
+                await self.show_now_playing(queue, channel_to_use, embed)
 
                 if queue.current.duration:
                     queue.progress_task = self.bot.loop.create_task(
                         self.update_progress_bar(queue.now_playing_message, queue)
                     )
 
-                await self.preload_next_song(guild.id)
+                await self.prefetch_next(guild.id)
 
             except Exception as e:
                 logger.error(f"Error setting up playback: {e}")
@@ -994,35 +1485,27 @@ class MusicCog(commands.Cog):
             return
 
         queue = self.get_queue(interaction.guild.id)
-        current_song = queue.current
-
         queue.text_channel = interaction.channel
+        # The after callback removes the skipped song's file off the event loop
         interaction.guild.voice_client.stop()
 
-        if current_song:
-            try:
-                if os.path.exists(current_song.filename):
-                    os.remove(current_song.filename)
-                    logger.info(f"Removed skipped song file: {current_song.filename}")
-            except Exception as e:
-                logger.error(f"Error removing skipped song file: {e}")
-
         await interaction.response.send_message("⏭️ 노래를 건너뛰었습니다.", ephemeral=True)
 
     @music_group.command(name="정지", description="재생을 멈추고 대기열을 초기화합니다")
     async def stop(self, interaction: discord.Interaction):
-        if not interaction.guild.voice_client:
+        voice_client = interaction.guild.voice_client
+        if not voice_client:
             await interaction.response.send_message("봇이 음성 채널에 없습니다.", ephemeral=True)
             return
 
         try:
             await interaction.response.send_message("⏹️ 재생을 멈추고 대기열을 초기화했습니다.", ephemeral=True)
 
-            if interaction.guild.voice_client.is_playing():
-                interaction.guild.voice_client.stop()
+            if voice_client.is_playing():
+                voice_client.stop()
 
             await self.cleanup_files(interaction.guild.id)
-            await interaction.guild.voice_client.disconnect()
+            await voice_client.disconnect()
 
         except Exception as e:
             logger.error(f"Error in stop command: {e}")
@@ -1042,6 +1525,7 @@ class MusicCog(commands.Cog):
             return
 
         interaction.guild.voice_client.pause()
+        self.get_queue(interaction.guild.id).mark_paused()
         await interaction.response.send_message("⏸️ 일시정지되었습니다.", ephemeral=True)
 
     @music_group.command(name="다시재생", description="일시정지된 노래를 다시 재생합니다")
@@ -1055,24 +1539,33 @@ class MusicCog(commands.Cog):
             return
 
         interaction.guild.voice_client.resume()
+        self.get_queue(interaction.guild.id).mark_resumed()
         await interaction.response.send_message("▶️ 다시 재생합니다.", ephemeral=True)
 
     @music_group.command(name="볼륨", description="볼륨을 조절합니다 (1-10, 기본값: 5)")
     async def volume(self, interaction: discord.Interaction, volume: app_commands.Range[int, 1, 10]):
         queue = self.get_queue(interaction.guild.id)
+        if volume / 10.0 == queue.volume:
+            # Nothing to restart or redraw
+            await interaction.response.send_message(f"🔊 볼륨이 이미 {volume}입니다.", ephemeral=True)
+            return
         queue.volume = volume / 10.0  # Convert to a percentage (0.0 to 1.0)
 
-        if interaction.guild.voice_client and interaction.guild.voice_client.source:
-            interaction.guild.voice_client.source.volume = queue.volume
-
+        # Acknowledge before restarting FFmpeg so process startup can't eat the response window
         await interaction.response.send_message(f"🔊 볼륨을 {int(queue.volume * 10)}로 설정했습니다.", ephemeral=True)
 
+        # Volume is baked into the FFmpeg filter chain, so running sources are restarted
+        queue.discard_prepared_source()
+        voice_client = interaction.guild.voice_client
+        if voice_client and voice_client.source and queue.current:
+            await self.apply_volume(voice_client, queue)
+
         if queue.now_playing_message:
             try:
                 embed = queue.now_playing_message.embeds[0]
                 progress_bar = self.create_progress_bar(queue.get_song_progress(), queue.current.duration)
                 embed.description = f"**{queue.current.title}**\n{progress_bar}\n볼륨: {int(queue.volume * 10)}"
-                await queue.now_playing_message.edit(embed=embed)
+                queue.now_playing_message = await queue.now_playing_message.edit(embed=embed)
             except Exception as e:
                 logger.error(f"Error updating now playing message volume: {e}")
 
@@ -1090,7 +1583,7 @@ class MusicCog(commands.Cog):
             progress = queue.get_song_progress()
             duration = queue.current.duration or 0
             time_info = (
-                f"\n⏰ {self.format_duration(int(progress))}/{self.format_duration(duration)}"
+                f"\n⏰ {self.format_duration(int(progress))}/{queue.current.duration_str}"
                 if duration else ""
             )
             embed.add_field(
@@ -1100,20 +1593,9 @@ class MusicCog(commands.Cog):
             )
 
         if queue.queue:
-            queue_slice = queue.queue[:10]
-            accumulated_time = queue.current.duration - queue.get_song_progress() if queue.current else 0
-
-            description = []
-            for i, song in enumerate(queue_slice, start=1):
-                time_info = f"⏰ 예상 대기시간: {self.format_duration(int(accumulated_time))}"
-                description.append(
-                    f"{i}. **{song.title}** (요청: {song.requester.display_name})\n   {time_info}"
-                )
-                accumulated_time += song.duration or 0
-
             embed.add_field(
                 name=f"대기 중인 노래 (총 {len(queue.queue)}곡)",
-                value="\n".join(description),
+                value=self.format_queue_page(queue, 0, 10),
                 inline=False
             )
 
@@ -1132,16 +1614,28 @@ class MusicCog(commands.Cog):
                 await interaction.response.send_message("올바른 대기열 번호를 입력해주세요.", ephemeral=True)
                 return
 
-            removed_song = queue.queue.pop(number - 1)
-            try:
-                os.remove(removed_song.filename)
-            except Exception as e:
-                logger.error(f"Error removing song file: {e}")
+            removed_song = queue.queue[number - 1]
+            del queue.queue[number - 1]
 
             await interaction.response.send_message(
                 f"🗑️ **{removed_song.title}**를 대기열에서 제거했습니다.",
                 ephemeral=True
             )
+
+            reprime = queue.preloaded_song is removed_song or (
+                queue.prepared_source and queue.prepared_source[0] is removed_song
+            )
+            if reprime:
+                # Kill its pre-started FFmpeg before deleting; Windows won't remove an open file
+                queue.preloaded_song = None
+                queue.discard_prepared_source()
+
+            if removed_song.filename and removed_song.filename not in self.files_in_use():
+                queue.owned_files.discard(removed_song.filename)
+                await self.bot.loop.run_in_executor(None, remove_files, [removed_song.filename])
+
+            if reprime:
+                await self.prefetch_next(interaction.guild.id)
         except Exception as e:
             logger.error(f"Error in remove command: {e}")
             await interaction.response.send_message("노래 제거 중 오류가 발생했습니다.", ephemeral=True)
@@ -1154,7 +1648,8 @@ class MusicCog(commands.Cog):
             await interaction.response.send_message("올바른 대기열 번호를 입력해주세요.", ephemeral=True)
             return
 
-        song = queue.queue.pop(from_pos - 1)
+        song = queue.queue[from_pos - 1]
+        del queue.queue[from_pos - 1]
         queue.queue.insert(to_pos - 1, song)
 
         await interaction.response.send_message(
@@ -1163,19 +1658,26 @@ class MusicCog(commands.Cog):
         )
 
         if from_pos == 1 or to_pos == 1:
+            # The prepared FFmpeg belongs to the old front song and would block priming the new one
             queue.preloaded_song = None
-            await self.preload_next_song(interaction.guild.id)
+            queue.discard_prepared_source()
+            await self.prefetch_next(interaction.guild.id)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState,
                                     after: discord.VoiceState):
-        if not member.guild.voice_client:
+        voice_client = member.guild.voice_client
+        if not voice_client:
+            return
+
+        # Only someone leaving the bot's channel can leave it alone there
+        if before.channel != voice_client.channel or after.channel == voice_client.channel:
             return
 
-        if len(member.guild.voice_client.channel.members) == 1:  # Only bot remains
+        if len(voice_client.channel.members) == 1:  # Only bot remains
             try:
                 await self.cleanup_files(member.guild.id)
-                await member.guild.voice_client.disconnect()
+                await voice_client.disconnect()
             except Exception as e:
                 logger.error(f"Error in voice state update: {e}")
 
@@ -1195,15 +1697,6 @@ class MusicCog(commands.Cog):
         queue.shuffle()
         await interaction.response.send_message("🔀 대기열을 섞었습니다.", ephemeral=True)
 
-    async def periodic_cache_cleanup(self):
-        while not self.bot.is_closed():
-            try:
-                self.song_cache.cleanup()
-                await asyncio.sleep(300)  # Run every 5 minutes
-            except Exception as e:
-                logger.error(f"Error in cache cleanup: {e}")
-                await asyncio.sleep(60)
-
 # =============================================================================
 # Setup Function
 # =============================================================================